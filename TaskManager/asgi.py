@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'TaskManager.settings')
 
 application = get_asgi_application()
+
+# Do the first-request work now instead of on the first requests. ASGI servers
+# may import this module inside a running event loop, where opening database
+# connections is not allowed, so the database is left to the first request.
+from TaskManager.warmup import warm_up
+
+warm_up(connect=False)
@@ -0,0 +1,56 @@
+"""
+Warm-up for the TaskManager project.
+
+Does the work that would otherwise happen lazily on the first requests of
+every worker: importing and resolving every route in main/urls.py, importing
+the serializers, loading the JWT backend and opening the database connections.
+"""
+
+import inspect
+
+from django.db import connections
+from django.urls import resolve, reverse
+from rest_framework.serializers import BaseSerializer
+
+
+def resolve_routes():
+    from main import urls
+
+    for pattern in urls.urlpatterns:
+        # Any value matches the `str` converters used by the task routes
+        kwargs = {name: '0' for name in pattern.pattern.converters}
+        resolve(reverse(pattern.name, kwargs=kwargs))
+
+
+def build_serializers():
+    from main import serializers
+
+    # `fields` is cached per instance, so this does not keep any field map around.
+    # It only pays for the imports and the model `_meta` lookups behind the fields.
+    for _, serializer_class in inspect.getmembers(serializers, inspect.isclass):
+        if issubclass(serializer_class, BaseSerializer) and serializer_class.__module__ == serializers.__name__:
+            serializer_class().fields
+
+
+def load_authentication():
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    # Encoding and validating a throwaway token imports the JWT backend and token classes
+    JWTAuthentication().get_validated_token(str(AccessToken()))
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def warm_up(connect=True):
+    resolve_routes()
+    build_serializers()
+    load_authentication()
+    if connect:
+        open_connections()
+        # Connections must not be shared with forked workers, each worker opens
+        # its own (see post_fork in gunicorn.conf.py)
+        connections.close_all()
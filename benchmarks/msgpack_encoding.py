@@ -0,0 +1,48 @@
+"""
+Serialization, encoding and decoding cost and payload size of a 100-task page
+as JSON and as MessagePack, using a throwaway test database. Run from the
+project root:
+
+    python benchmarks/msgpack_encoding.py
+"""
+
+import io
+from datetime import timedelta
+from types import SimpleNamespace
+
+from common import client_for, median_ms, test_database
+
+from django.utils.timezone import now
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from main.models import Task
+from main.parsers import MessagePackParser
+from main.renderers import MessagePackRenderer
+from main.serializers import TaskSerializer
+
+PAGE_SIZE = 100
+RUNS = 200
+
+
+def main():
+    with test_database():
+        user, _ = client_for('bench')
+        Task.objects.bulk_create([
+            Task(user=user, title=f'Task {i}', description=f'Description of task {i}', category='work', due_date=now() + timedelta(hours=i))
+            for i in range(PAGE_SIZE)
+        ])
+        page = list(Task.objects.filter(user=user))
+
+        print(f"{PAGE_SIZE} tasks per page, median of {RUNS} runs")
+        print(f"{'format':<12} {'serialize':>12} {'encode':>12} {'decode':>12} {'bytes':>10}")
+        for renderer, parser in ((JSONRenderer(), JSONParser()), (MessagePackRenderer(), MessagePackParser())):
+            context = {'request': SimpleNamespace(accepted_renderer=renderer)}
+            serialize_ms, data = median_ms(lambda: TaskSerializer(page, many=True, context=context).data, RUNS)
+            encode_ms, body = median_ms(lambda: renderer.render(data), RUNS)
+            decode_ms, _ = median_ms(lambda: parser.parse(io.BytesIO(body)), RUNS)
+            print(f"{renderer.format:<12} {serialize_ms * 1000:>9.0f} us {encode_ms * 1000:>9.0f} us {decode_ms * 1000:>9.0f} us {len(body):>10,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Storage and agenda query cost of recurring tasks as the recurrence horizon grows.
+
+Compares storing one row per occurrence (copies) with a single recurring task,
+using a throwaway test database. Run from the project root:
+
+    python benchmarks/recurrence.py
+"""
+
+from datetime import timedelta
+
+from common import client_for, median_ms, test_database
+
+from django.utils.timezone import now
+
+from main.models import Task
+
+HORIZONS = (30, 365, 3650)
+TASKS = 10
+WINDOW_DAYS = 7
+RUNS = 30
+
+
+def main():
+    with test_database():
+        first = now() + timedelta(hours=1)
+        print(f"{TASKS} daily tasks, {WINDOW_DAYS}-day agenda window at the end of the horizon")
+        print(f"{'horizon':>8} {'rows copies':>12} {'rows rule':>10} {'agenda copies':>14} {'agenda rule':>12}")
+        for horizon in HORIZONS:
+            copies_user, copies_client = client_for(f'copies{horizon}')
+            rule_user, rule_client = client_for(f'rule{horizon}')
+            for i in range(TASKS):
+                Task.objects.bulk_create([
+                    Task(user=copies_user, title=f'Task {i}', description='Description', category='work', due_date=first + timedelta(days=day))
+                    for day in range(horizon)
+                ])
+                Task.objects.create(
+                    user=rule_user, title=f'Task {i}', description='Description', category='work',
+                    due_date=first, recurrence='daily', recurrence_until=first + timedelta(days=horizon - 1)
+                )
+
+            window_start = (first + timedelta(days=horizon - WINDOW_DAYS)).isoformat().replace('+00:00', 'Z')
+            url = f'/api/tasks/agenda?start={window_start}&page_size=100'
+            copies_ms, copies_response = median_ms(lambda: copies_client.get(url), RUNS)
+            rule_ms, rule_response = median_ms(lambda: rule_client.get(url), RUNS)
+            copies_count, rule_count = copies_response.json()['count'], rule_response.json()['count']
+            assert copies_count == rule_count, (copies_count, rule_count)
+
+            print(f"{horizon:>7}d {Task.objects.filter(user=copies_user).count():>12} {Task.objects.filter(user=rule_user).count():>10} "
+                  f"{copies_ms:>11.2f} ms {rule_ms:>9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Startup time and first-request latency of a Gunicorn worker, comparing a
+stock Gunicorn run (no preload, no warm-up) with the project's
+gunicorn.conf.py. Uses a throwaway SQLite database. Run from the project root:
+
+    python benchmarks/server_startup.py
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PORT = 8123
+RUNS = 5
+WARM_REQUESTS = 20
+COMMANDS = {
+    'stock': ['-c', '/dev/null', 'TaskManager.wsgi:application'],
+    'gunicorn.conf.py': ['-c', 'gunicorn.conf.py'],
+}
+
+
+def wait_for_port(timeout=30):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', PORT), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.001)
+    raise RuntimeError(f'Gunicorn did not start listening on port {PORT}')
+
+
+def get_ms(token):
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{PORT}/api/tasks/list',
+        headers={'Authorization': f'Bearer {token}', 'Host': 'localhost'},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        response.read()
+        assert response.status == 200, response.status
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(args, env, token):
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *args, '-w', '1', '-b', f'127.0.0.1:{PORT}'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port()
+        listen_ms = (time.perf_counter() - start) * 1000
+        first_ms = get_ms(token)
+        warm_ms = statistics.median(get_ms(token) for _ in range(WARM_REQUESTS))
+    finally:
+        server.terminate()
+        server.wait()
+    return listen_ms, first_ms, warm_ms
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='benchmarks.settings', BENCHMARK_DB=str(Path(directory) / 'db.sqlite3'))
+        os.environ.update(env)
+        sys.path.insert(0, str(ROOT))
+
+        import django
+
+        django.setup()
+
+        from datetime import timedelta
+
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+        from django.utils.timezone import now
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        from main.models import Task
+
+        call_command('migrate', verbosity=0)
+        user = User.objects.create_user(username='bench', password='benchpass123')
+        Task.objects.bulk_create([
+            Task(user=user, title=f'Task {i}', description='Description', category='work', due_date=now() + timedelta(hours=i))
+            for i in range(20)
+        ])
+        token = RefreshToken.for_user(user).access_token
+
+        print(f"1 worker, median of {RUNS} starts, {WARM_REQUESTS} warm requests per start")
+        print(f"{'config':<18} {'listening':>12} {'first request':>15} {'warm request':>14}")
+        for name, args in COMMANDS.items():
+            results = [measure(args, env, token) for _ in range(RUNS)]
+            listen_ms, first_ms, warm_ms = (statistics.median(values) for values in zip(*results))
+            print(f"{name:<18} {listen_ms:>9.0f} ms {first_ms:>12.1f} ms {warm_ms:>11.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
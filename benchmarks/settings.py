@@ -0,0 +1,11 @@
+"""
+Project settings pointed at the database given in BENCHMARK_DB, so that
+benchmarks which start real servers do not touch db.sqlite3.
+"""
+
+import os
+
+from TaskManager.settings import *  # noqa: F401,F403
+
+DATABASES['default']['NAME'] = os.environ['BENCHMARK_DB']  # noqa: F405
+ALLOWED_HOSTS = ['localhost']
@@ -0,0 +1,45 @@
+"""
+Payload size and latency of the list and overdue endpoints with and without
+a sparse fieldset, on tasks with large descriptions, using a throwaway test
+database. Run from the project root:
+
+    python benchmarks/sparse_fields.py
+"""
+
+from datetime import timedelta
+
+from common import client_for, median_ms, test_database
+
+from django.utils.timezone import now
+
+from main.models import Task
+
+TASKS = 200
+DESCRIPTION_SIZE = 20000
+PAGE_SIZE = 100
+FIELDS = 'id,title,completed,due_date'
+RUNS = 50
+
+
+def main():
+    with test_database():
+        user, client = client_for('bench')
+        Task.objects.bulk_create([
+            Task(user=user, title=f'Task {i}', description='x' * DESCRIPTION_SIZE, category='work', due_date=now() - timedelta(hours=i + 1))
+            for i in range(TASKS)
+        ])
+
+        print(f"{TASKS} tasks with {DESCRIPTION_SIZE // 1000} KB descriptions, page_size={PAGE_SIZE}")
+        print(f"{'endpoint':<10} {'fields':<28} {'latency':>10} {'bytes':>10}")
+        for endpoint in ('list', 'overdue'):
+            for fields in ('all', FIELDS):
+                url = f'/api/tasks/{endpoint}?page_size={PAGE_SIZE}'
+                if fields != 'all':
+                    url += f'&fields={fields}'
+                ms, response = median_ms(lambda: client.get(url), RUNS)
+                assert response.status_code == 200, response.content
+                print(f"{endpoint:<10} {fields:<28} {ms:>7.2f} ms {len(response.content):>10,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Gunicorn config for running TaskManager in production.
+
+    gunicorn
+
+The app is imported and warmed up once in the master process (see
+TaskManager/warmup.py) and then forked, so new workers serve their first
+request without paying for imports and URL/serializer setup.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = 'TaskManager.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Load the app before forking the workers
+preload_app = True
+
+
+def available_cores():
+    # Respect CPU affinity limits (e.g. containers) where the platform supports it
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+workers = int(os.environ.get('WEB_CONCURRENCY', available_cores() * 2 + 1))
+
+# Recycle workers now and then, staggered so they do not all restart at once
+max_requests = 1000
+max_requests_jitter = 100
+
+
+def on_starting(server):
+    # Runs in the master after the app is preloaded and before the workers are forked
+    from TaskManager.warmup import warm_up
+
+    warm_up()
+
+
+def post_fork(server, worker):
+    from TaskManager.warmup import open_connections
+
+    open_connections()
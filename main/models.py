@@ -7,6 +7,12 @@ class Task(models.Model):
         ('work', 'Work'),
         ('personal', 'Personal'),
     ]
+    RECURRENCE_CHOICES = [
+        ('none', 'None'),
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=200, null=False, blank=False)
@@ -16,5 +22,28 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Recurrence rule, anchored on `due_date` as the first occurrence.
+    # The rule ends at `recurrence_until` or after `recurrence_count` occurrences, if set.
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default='none')
+    recurrence_interval = models.PositiveIntegerField(default=1)
+    recurrence_until = models.DateTimeField(null=True, blank=True)
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True)
+
     def __str__(self):
         return self.title
+
+
+class TaskOccurrence(models.Model):
+    ''' Completion state of a single occurrence of a recurring task.
+        Rows only exist for occurrences that have been updated. '''
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='occurrences')
+    occurrence_date = models.DateTimeField()
+    completed = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'occurrence_date'], name='unique_task_occurrence'),
+        ]
+
+    def __str__(self):
+        return f"{self.task.title} ({self.occurrence_date})"
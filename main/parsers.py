@@ -0,0 +1,23 @@
+import uuid
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from .renderers import UUID_EXT_TYPE
+
+
+def decode_ext(code, data):
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+    return msgpack.ExtType(code, data)
+
+
+class MessagePackParser(BaseParser):
+    ''' Parses MessagePack request bodies. Timestamps are decoded to aware
+        datetimes and UUID_EXT_TYPE values to UUIDs. '''
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), ext_hook=decode_ext, timestamp=3, raw=False)
+        except Exception as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
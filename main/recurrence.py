@@ -0,0 +1,102 @@
+''' Lazy expansion of recurring tasks.
+    Occurrences are never stored, they are computed from the rule on the task
+    for the window that is requested. '''
+
+import calendar
+from datetime import timedelta
+
+# Columns needed to expand the occurrences of a task
+RECURRENCE_FIELDS = ['due_date', 'recurrence', 'recurrence_interval', 'recurrence_until', 'recurrence_count']
+
+
+def is_recurring(task):
+    return task.recurrence != 'none' and task.due_date is not None
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    # Clamp the day so that e.g. the 31st falls on the last day of shorter months
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def occurrence_at(task, index):
+    ''' Return the date of the occurrence at position `index` of the rule (0 is `due_date`). '''
+    if task.recurrence == 'monthly':
+        return add_months(task.due_date, index * task.recurrence_interval)
+    return task.due_date + index * _step(task)
+
+
+def _step(task):
+    days = 7 if task.recurrence == 'weekly' else 1
+    return timedelta(days=days * task.recurrence_interval)
+
+
+def _last_index(task):
+    ''' Index of the final occurrence allowed by the end conditions, or None if the rule is unbounded. '''
+    last_index = None
+    if task.recurrence_count is not None:
+        last_index = task.recurrence_count - 1
+    if task.recurrence_until is not None:
+        until_index = _index_at_or_before(task, task.recurrence_until)
+        last_index = until_index if last_index is None else min(last_index, until_index)
+    return last_index
+
+
+def _index_at_or_before(task, moment):
+    ''' Index of the latest occurrence at or before `moment`, ignoring end conditions. -1 if there is none. '''
+    if moment < task.due_date:
+        return -1
+    if task.recurrence == 'monthly':
+        months = (moment.year - task.due_date.year) * 12 + moment.month - task.due_date.month
+        index = months // task.recurrence_interval
+        # The occurrence in the same month as `moment` may still be ahead of it
+        while index >= 0 and occurrence_at(task, index) > moment:
+            index -= 1
+        return index
+    return (moment - task.due_date) // _step(task)
+
+
+def occurrences_between(task, start, end):
+    ''' Yield the occurrence dates of a task that fall within [start, end). '''
+    if not is_recurring(task):
+        if task.due_date is not None and start <= task.due_date < end:
+            yield task.due_date
+        return
+
+    index = _index_at_or_before(task, start)
+    if index < 0 or occurrence_at(task, index) < start:
+        index += 1
+    last_index = _last_index(task)
+
+    while last_index is None or index <= last_index:
+        occurrence = occurrence_at(task, index)
+        if occurrence >= end:
+            break
+        yield occurrence
+        index += 1
+
+
+def last_occurrence_before(task, moment):
+    ''' Return the latest occurrence strictly before `moment`, or None. '''
+    if not is_recurring(task):
+        if task.due_date is not None and task.due_date < moment:
+            return task.due_date
+        return None
+
+    index = _index_at_or_before(task, moment)
+    if index >= 0 and occurrence_at(task, index) == moment:
+        index -= 1
+    last_index = _last_index(task)
+    if last_index is not None:
+        index = min(index, last_index)
+    if index < 0:
+        return None
+    return occurrence_at(task, index)
+
+
+def is_occurrence(task, moment):
+    ''' Check whether `moment` is one of the occurrences of the task. '''
+    return next(occurrences_between(task, moment, moment + timedelta(microseconds=1)), None) is not None
@@ -0,0 +1,31 @@
+import uuid
+import msgpack
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer
+
+# MessagePack extension type used for UUIDs, stored as their 16 raw bytes
+UUID_EXT_TYPE = 1
+
+
+def encode_default(obj):
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, obj.bytes)
+    if isinstance(obj, Promise):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not MessagePack serializable")
+
+
+class MessagePackRenderer(BaseRenderer):
+    ''' Renders responses as MessagePack. Datetimes are encoded with the
+        timestamp extension type and UUIDs with UUID_EXT_TYPE. '''
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    # Serializers keep UUIDs and datetimes as objects for this renderer
+    native_types = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, datetime=True)
@@ -61,7 +61,9 @@ task_list_schema = extend_schema(
         OpenApiParameter(name="category", type=str, description="Filter tasks by category", required=False),
         OpenApiParameter(name="search", type=str, description="Search for a task with a keyword", required=False),
         OpenApiParameter(name='page', description='Page number', required=False, type=int),
-        OpenApiParameter(name='page_size', description='Number of tasks per page', required=False, type=int)
+        OpenApiParameter(name='page_size', description='Number of tasks per page', required=False, type=int),
+        OpenApiParameter(name="fields", type=str, description="Comma-separated list of task fields to return, e.g. id,title,completed,due_date", required=False),
+        OpenApiParameter(name="exclude", type=str, description="Comma-separated list of task fields to leave out of the response", required=False)
     ],
 )
 
@@ -73,7 +75,26 @@ task_overdue_schema = extend_schema(
         OpenApiParameter(name="category", type=str, description="Filter tasks by category", required=False),
         OpenApiParameter(name="search", type=str, description="Search for a task with a keyword", required=False),
         OpenApiParameter(name='page', description='Page number', required=False, type=int),
-        OpenApiParameter(name='page_size', description='Number of tasks per page', required=False, type=int)
+        OpenApiParameter(name='page_size', description='Number of tasks per page', required=False, type=int),
+        OpenApiParameter(name="fields", type=str, description="Comma-separated list of task fields to return, e.g. id,title,completed,due_date", required=False),
+        OpenApiParameter(name="exclude", type=str, description="Comma-separated list of task fields to leave out of the response", required=False)
+    ],
+)
+
+# Task agenda Schema
+task_agenda_schema = extend_schema(
+    summary="Task Agenda",
+    description="Retrieve every occurrence of the user's tasks between `start` and `end`, with recurring tasks expanded "
+                "for that window only. Defaults to the next 7 days; the window can be at most 366 days long.",
+    parameters=[
+        OpenApiParameter(name="start", type=str, description="Start of the window (ISO 8601), defaults to now", required=False),
+        OpenApiParameter(name="end", type=str, description="End of the window (ISO 8601), defaults to 7 days after start", required=False),
+        OpenApiParameter(name="category", type=str, description="Filter tasks by category", required=False),
+        OpenApiParameter(name="search", type=str, description="Search for a task with a keyword", required=False),
+        OpenApiParameter(name='page', description='Page number', required=False, type=int),
+        OpenApiParameter(name='page_size', description='Number of occurrences per page', required=False, type=int),
+        OpenApiParameter(name="fields", type=str, description="Comma-separated list of task fields to return, e.g. id,title,completed,due_date", required=False),
+        OpenApiParameter(name="exclude", type=str, description="Comma-separated list of task fields to leave out of the response", required=False)
     ],
 )
 
@@ -93,6 +114,10 @@ task_create_schema = extend_schema(
                     "format": "date-time",
                     "example": "2025-02-15T14:30:00Z"
                 },
+                "recurrence": {"type": "string", "enum": ["none", "daily", "weekly", "monthly"]},
+                "recurrence_interval": {"type": "integer", "example": 1},
+                "recurrence_until": {"type": "string", "format": "date-time"},
+                "recurrence_count": {"type": "integer"},
             },
         }
     },
@@ -110,8 +135,70 @@ task_update_schema = extend_schema(
     description="Update specific fields of a task without replacing the entire object.",
 )
 
+# Task Occurrence Update Schema
+task_occurrence_update_schema = extend_schema(
+    summary="Update an Occurrence of a recurring Task",
+    description="Mark a single occurrence of a recurring task as completed or not completed.",
+    request={
+        "application/json": {
+            "type": "object",
+            "required": ["occurrence_date", "completed"],
+            "properties": {
+                "occurrence_date": {"type": "string", "format": "date-time"},
+                "completed": {"type": "boolean"},
+            },
+        }
+    },
+)
+
 # Task Delete Schema
 task_delete_schema = extend_schema(
     summary="Delete a Task",
     description="Remove a specific task from the system permanently.",
 )
+
+# Batch Schema
+batch_schema = extend_schema(
+    summary="Batch Requests",
+    description="Run several API requests in a single round trip. The user is authenticated once for the whole batch. "
+                "Set `parallel` to run a batch made up only of GET requests concurrently. "
+                "Other batches run in order in one transaction: if a database error occurs, none of their changes are saved.",
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "parallel": {"type": "boolean"},
+                "requests": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "method": {"type": "string", "example": "GET"},
+                            "path": {"type": "string", "example": "/api/tasks/list?page_size=5"},
+                            "body": {"type": "object"},
+                        },
+                    },
+                },
+            },
+        }
+    },
+    responses={
+        200: {
+            "type": "object",
+            "properties": {
+                "responses": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "status": {"type": "integer"},
+                            "body": {"type": "object"},
+                        },
+                    },
+                }
+            },
+        },
+        400: {"type": "object", "properties": {"error": {"type": "string"}}},
+        500: {"type": "object", "properties": {"error": {"type": "string"}, "failed_request": {"type": "integer"}}},
+    },
+)
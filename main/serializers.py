@@ -1,7 +1,9 @@
 from rest_framework import serializers
-from .models import Task
+from .models import Task, TaskOccurrence
+from .recurrence import is_occurrence
 from django.contrib.auth.models import User
 from django.utils.timezone import now
+from django.db import transaction
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,12 +11,93 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'password')
         extra_kwargs = {'password': {'write_only': True}}
 
-class TaskSerializer(serializers.ModelSerializer):
+class NativeUUIDField(serializers.UUIDField):
+    def to_representation(self, value):
+        return value
+
+class NativeTypesMixin:
+    ''' Leave UUIDs and datetimes as Python objects when the negotiated
+        renderer can encode them natively, instead of converting them to strings. '''
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request', None)
+
+        if getattr(getattr(request, 'accepted_renderer', None), 'native_types', False):
+            for field_name, field in fields.items():
+                if isinstance(field, serializers.DateTimeField):
+                    field.format = None
+                elif isinstance(field, serializers.UUIDField):
+                    fields[field_name] = NativeUUIDField(*field._args, **field._kwargs)
+        return fields
+
+class TaskSerializer(NativeTypesMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ["id", "title", "description", "category", "completed", "due_date", "created_at"]
+        fields = [
+            "id", "title", "description", "category", "completed", "due_date", "created_at",
+            "recurrence", "recurrence_interval", "recurrence_until", "recurrence_count"
+        ]
+
+    def __init__(self, *args, **kwargs):
+        # Optional `fields` argument restricts the output to a subset of Meta.fields
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
     def validate_due_date(self, value):
         if value and value < now():
             raise serializers.ValidationError("Due date cannot be in the past.")
-        return value
\ No newline at end of file
+        return value
+
+    def validate_recurrence_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Recurrence interval must be at least 1.")
+        return value
+
+    def validate_recurrence_count(self, value):
+        if value is not None and value < 1:
+            raise serializers.ValidationError("Recurrence count must be at least 1.")
+        return value
+
+    def validate(self, attrs):
+        # Fall back to the stored values on partial updates
+        def current(field):
+            if field in attrs:
+                return attrs[field]
+            return getattr(self.instance, field, None)
+
+        if current('recurrence') not in (None, 'none'):
+            if current('due_date') is None:
+                raise serializers.ValidationError({"due_date": "Recurring tasks need a due date for the first occurrence."})
+            if current('recurrence_until') is not None and current('recurrence_count') is not None:
+                raise serializers.ValidationError("Use either recurrence_until or recurrence_count, not both.")
+        return attrs
+
+    def update(self, instance, validated_data):
+        # Stored occurrences are keyed by date, so they no longer line up once the rule moves them
+        def changed(fields):
+            return any(field in validated_data and validated_data[field] != getattr(instance, field) for field in fields)
+
+        rule_changed = changed(('due_date', 'recurrence', 'recurrence_interval'))
+        end_changed = changed(('recurrence_until', 'recurrence_count'))
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if rule_changed:
+                instance.occurrences.all().delete()
+            elif end_changed:
+                # Only the occurrences the new end condition cuts off are dropped
+                instance.occurrences.filter(id__in=[
+                    occurrence.id for occurrence in instance.occurrences.all()
+                    if not is_occurrence(instance, occurrence.occurrence_date)
+                ]).delete()
+        return instance
+
+
+class TaskOccurrenceSerializer(NativeTypesMixin, serializers.ModelSerializer):
+    class Meta:
+        model = TaskOccurrence
+        fields = ["occurrence_date", "completed"]
+        extra_kwargs = {'completed': {'required': True}}
@@ -1,3 +1,349 @@
-from django.test import TestCase
+import asyncio
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import msgpack
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from TaskManager.warmup import build_serializers, load_authentication, resolve_routes
+
+from .models import Task, TaskOccurrence
+from .recurrence import is_occurrence, last_occurrence_before, occurrences_between
+from .serializers import TaskSerializer
+
+
+class APIClientMixin:
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='testpass123')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(self.user).access_token}")
+
+    def create_task(self, **kwargs):
+        values = {'user': self.user, 'title': 'Task', 'description': 'Description', 'category': 'work'}
+        values.update(kwargs)
+        return Task.objects.create(**values)
+
+
+class APITestCase(APIClientMixin, TestCase):
+    pass
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class RecurrenceTests(SimpleTestCase):
+    def rule(self, recurrence, due_date, **kwargs):
+        return Task(recurrence=recurrence, due_date=due_date, **kwargs)
+
+    def test_monthly_clamps_to_the_end_of_shorter_months(self):
+        task = self.rule('monthly', utc(2025, 1, 31, 9))
+        occurrences = list(occurrences_between(task, utc(2025, 1, 1), utc(2025, 5, 1)))
+        self.assertEqual(occurrences, [utc(2025, 1, 31, 9), utc(2025, 2, 28, 9), utc(2025, 3, 31, 9), utc(2025, 4, 30, 9)])
+        self.assertEqual(last_occurrence_before(task, utc(2025, 3, 1)), utc(2025, 2, 28, 9))
+        self.assertTrue(is_occurrence(task, utc(2025, 2, 28, 9)))
+        self.assertFalse(is_occurrence(task, utc(2025, 2, 27, 9)))
+
+    def test_monthly_clamps_to_leap_day(self):
+        task = self.rule('monthly', utc(2024, 1, 31), recurrence_interval=1)
+        self.assertEqual(list(occurrences_between(task, utc(2024, 2, 1), utc(2024, 3, 1))), [utc(2024, 2, 29)])
+
+    def test_window_starting_on_an_occurrence_includes_it(self):
+        task = self.rule('weekly', utc(2025, 1, 1, 9), recurrence_interval=2)
+        occurrences = list(occurrences_between(task, utc(2025, 1, 15, 9), utc(2025, 2, 12, 9)))
+        self.assertEqual(occurrences, [utc(2025, 1, 15, 9), utc(2025, 1, 29, 9)])
+        # The end of the window is exclusive, and so is the moment for last_occurrence_before
+        self.assertEqual(last_occurrence_before(task, utc(2025, 1, 29, 9)), utc(2025, 1, 15, 9))
+
+    def test_until_before_due_date_has_no_occurrences(self):
+        task = self.rule('daily', utc(2025, 1, 10), recurrence_until=utc(2025, 1, 5))
+        self.assertEqual(list(occurrences_between(task, utc(2025, 1, 1), utc(2025, 2, 1))), [])
+        self.assertIsNone(last_occurrence_before(task, utc(2025, 2, 1)))
+        self.assertFalse(is_occurrence(task, utc(2025, 1, 10)))
+
+    def test_until_is_inclusive(self):
+        task = self.rule('daily', utc(2025, 1, 1), recurrence_until=utc(2025, 1, 3))
+        self.assertEqual(list(occurrences_between(task, utc(2025, 1, 1), utc(2025, 2, 1))), [utc(2025, 1, 1), utc(2025, 1, 2), utc(2025, 1, 3)])
+        self.assertEqual(last_occurrence_before(task, utc(2025, 6, 1)), utc(2025, 1, 3))
+
+    def test_count_exhausted_before_the_window(self):
+        task = self.rule('daily', utc(2025, 1, 1), recurrence_count=3)
+        self.assertEqual(list(occurrences_between(task, utc(2025, 1, 10), utc(2025, 2, 1))), [])
+        self.assertEqual(last_occurrence_before(task, utc(2025, 2, 1)), utc(2025, 1, 3))
+        self.assertFalse(is_occurrence(task, utc(2025, 1, 4)))
+
+    def test_window_far_from_due_date(self):
+        task = self.rule('daily', utc(2000, 1, 1, 12))
+        self.assertEqual(list(occurrences_between(task, utc(2030, 1, 1), utc(2030, 1, 3))), [utc(2030, 1, 1, 12), utc(2030, 1, 2, 12)])
+
+    def test_single_task_occurs_once(self):
+        task = self.rule('none', utc(2025, 1, 1))
+        self.assertEqual(list(occurrences_between(task, utc(2025, 1, 1), utc(2025, 1, 2))), [utc(2025, 1, 1)])
+        self.assertEqual(list(occurrences_between(task, utc(2025, 1, 2), utc(2025, 2, 1))), [])
+        self.assertIsNone(last_occurrence_before(task, utc(2025, 1, 1)))
+
+
+class SparseFieldsetTests(APITestCase):
+    def test_fields_limit_the_response(self):
+        self.create_task()
+        response = self.client.get('/api/tasks/list?fields=id,title')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'title'})
+
+    def test_unselected_columns_are_not_read(self):
+        self.create_task(due_date=now() - timedelta(hours=1))
+        for endpoint in ('list', 'overdue'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(f'/api/tasks/{endpoint}?fields=id,title,completed,due_date')
+            self.assertEqual(response.status_code, 200)
+            selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT') and '"main_task"."title"' in query['sql']]
+            self.assertTrue(selects, endpoint)
+            for sql in selects:
+                self.assertNotIn('"main_task"."description"', sql, endpoint)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/tasks/list?fields=id,nope')
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty_selection_is_rejected(self):
+        self.create_task()
+        for query in ('fields=title&exclude=title', 'exclude=' + ','.join(TaskSerializer.Meta.fields)):
+            for endpoint in ('list', 'overdue', 'agenda'):
+                response = self.client.get(f'/api/tasks/{endpoint}?{query}')
+                self.assertEqual(response.status_code, 400, (endpoint, query))
+
+
+class BatchTests(APITestCase):
+    def test_dispatches_sub_requests(self):
+        task = self.create_task()
+        response = self.client.post('/api/batch', {'requests': [
+            {'method': 'GET', 'path': f'/api/tasks/{task.id}/'},
+            {'method': 'PATCH', 'path': f'/api/tasks/{task.id}/update/', 'body': {'completed': True}},
+            {'method': 'GET', 'path': '/api/batch'},
+            {'method': 'GET', 'path': '/missing'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['status'] for item in response.json()['responses']], [200, 200, 400, 404])
+        task.refresh_from_db()
+        self.assertTrue(task.completed)
+
+    def test_non_object_body_is_rejected(self):
+        for body in ([1, 2], 'requests', None):
+            response = self.client.post('/api/batch', body, format='json')
+            self.assertEqual(response.status_code, 400, body)
+
+    def test_sub_request_errors_are_logged(self):
+        task = self.create_task()
+        with mock.patch('main.views.TaskRetrieve.get', side_effect=RuntimeError('boom')), self.assertLogs('main.views', 'ERROR'):
+            response = self.client.post('/api/batch', {'requests': [{'method': 'GET', 'path': f'/api/tasks/{task.id}/'}]}, format='json')
+        self.assertEqual(response.json()['responses'][0]['status'], 500)
+
+    def test_database_error_rolls_back_the_whole_batch(self):
+        task = self.create_task()
+        with mock.patch('main.views.TaskUpdate.patch', side_effect=DatabaseError('down')), self.assertLogs('main.views', 'ERROR'):
+            response = self.client.post('/api/batch', {'requests': [
+                {'method': 'POST', 'path': '/api/tasks/create', 'body': {'title': 'New', 'description': 'Description', 'category': 'work'}},
+                {'method': 'PATCH', 'path': f'/api/tasks/{task.id}/update/', 'body': {'completed': True}},
+            ]}, format='json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()['failed_request'], 1)
+        self.assertFalse(Task.objects.filter(title='New').exists())
+
+    def test_handled_errors_only_roll_back_their_own_sub_request(self):
+        response = self.client.post('/api/batch', {'requests': [
+            {'method': 'POST', 'path': '/auth/signup/', 'body': {'username': 'tester', 'password': 'otherpass123'}},
+            {'method': 'POST', 'path': '/api/tasks/create', 'body': {'title': 'New', 'description': 'Description', 'category': 'work'}},
+        ]}, format='json')
+        self.assertEqual([item['status'] for item in response.json()['responses']], [400, 201])
+        self.assertTrue(Task.objects.filter(title='New').exists())
+
+    def test_parallel_must_be_a_boolean(self):
+        response = self.client.post('/api/batch', {'parallel': 'false', 'requests': [{'method': 'GET', 'path': '/api/tasks/list'}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ParallelBatchTests(APIClientMixin, TransactionTestCase):
+    def without_overdue_by(self, responses):
+        # overdue_by depends on the current time, so it is left out of comparisons
+        for item in responses:
+            results = item['body'].get('results')
+            if isinstance(results, dict):
+                for task in results['tasks']:
+                    task.pop('overdue_by')
+        return responses
+
+    def test_concurrent_reads_match_sequential_results(self):
+        task = self.create_task(due_date=now() - timedelta(hours=1))
+        requests = [
+            {'method': 'GET', 'path': '/api/tasks/list'},
+            {'method': 'GET', 'path': '/api/tasks/overdue'},
+            {'method': 'GET', 'path': f'/api/tasks/{task.id}/'},
+        ]
+        sequential = self.client.post('/api/batch', {'requests': requests}, format='json').json()['responses']
+        with mock.patch('main.views.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as executor:
+            parallel = self.client.post('/api/batch', {'parallel': True, 'requests': requests}, format='json').json()['responses']
+        self.assertTrue(executor.called)
+        self.assertEqual([item['status'] for item in parallel], [200, 200, 200])
+        self.assertEqual(self.without_overdue_by(parallel), self.without_overdue_by(sequential))
+
+
+class MessagePackTests(APITestCase):
+    def unpack(self, response):
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        return msgpack.unpackb(response.content, timestamp=3, ext_hook=msgpack.ExtType)
+
+    def test_responses_encode_uuids_and_datetimes_natively(self):
+        task = self.create_task(due_date=now() - timedelta(hours=1))
+        upcoming = self.create_task(due_date=now() + timedelta(hours=1))
+        responses = {
+            'list': self.client.get('/api/tasks/list', HTTP_ACCEPT='application/msgpack'),
+            'overdue': self.client.get('/api/tasks/overdue', HTTP_ACCEPT='application/msgpack'),
+            'agenda': self.client.get('/api/tasks/agenda', HTTP_ACCEPT='application/msgpack'),
+        }
+        tasks = {
+            'list': next(item for item in self.unpack(responses['list'])['results'] if item['id'].data == task.id.bytes),
+            'overdue': self.unpack(responses['overdue'])['results']['tasks'][0],
+            'agenda': self.unpack(responses['agenda'])['results'][0],
+        }
+        expected = {'list': task, 'overdue': task, 'agenda': upcoming}
+        for endpoint, item in tasks.items():
+            self.assertEqual(item['id'], msgpack.ExtType(1, expected[endpoint].id.bytes), endpoint)
+            self.assertEqual(item['due_date'], expected[endpoint].due_date, endpoint)
+            self.assertIsInstance(item['created_at'], datetime, endpoint)
+        self.assertIsInstance(tasks['agenda']['occurrence_date'], datetime)
+
+    def test_create_from_messagepack(self):
+        due_date = now() + timedelta(days=1)
+        body = msgpack.packb({'title': 'Packed', 'description': 'Description', 'category': 'work', 'due_date': due_date}, datetime=True)
+        response = self.client.post('/api/tasks/create', body, content_type='application/msgpack', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+        task = Task.objects.get(title='Packed', user=self.user)
+        self.assertEqual(task.due_date, due_date)
+        self.assertEqual(self.unpack(response)['id'], msgpack.ExtType(1, task.id.bytes))
+
+    def test_malformed_body_is_rejected(self):
+        response = self.client.post('/api/tasks/create', b'\xc1', content_type='application/msgpack')
+        self.assertEqual(response.status_code, 400)
+
+    def test_json_output_is_unchanged(self):
+        task = self.create_task(due_date=utc(2030, 1, 2, 3, 4, 5))
+        response = self.client.get(f'/api/tasks/{task.id}/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['id'], str(task.id))
+        self.assertEqual(response.json()['due_date'], '2030-01-02T03:04:05Z')
+
+
+class TaskOverdueTests(APITestCase):
+    def test_completed_occurrences_are_excluded_before_paginating(self):
+        tasks = [self.create_task(title=f'Task {i}', due_date=now() - timedelta(days=3, hours=i), recurrence='daily') for i in range(3)]
+        for task in tasks[:2]:
+            TaskOccurrence.objects.create(task=task, occurrence_date=last_occurrence_before(task, now()), completed=True)
+
+        response = self.client.get('/api/tasks/overdue?page_size=2')
+        data = response.json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual([task['id'] for task in data['results']['tasks']], [str(tasks[2].id)])
+        self.assertIsNone(data['next'])
+
+    def test_many_recurring_tasks(self):
+        started = now() - timedelta(days=3)
+        tasks = Task.objects.bulk_create([
+            Task(user=self.user, title=f'Task {i}', description='Description', category='work', due_date=started, recurrence='daily')
+            for i in range(1200)
+        ])
+        latest = last_occurrence_before(tasks[0], now())
+        TaskOccurrence.objects.bulk_create([TaskOccurrence(task=task, occurrence_date=latest, completed=True) for task in tasks[:3]])
+        # An older completed occurrence does not hide the missed latest one
+        TaskOccurrence.objects.create(task=tasks[3], occurrence_date=latest - timedelta(days=1), completed=True)
+
+        # The number of bound parameters must not grow with the number of recurring tasks
+        param_counts = []
+
+        def count_params(execute, sql, params, many, context):
+            param_counts.append(len(params or ()))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_params):
+            response = self.client.get('/api/tasks/overdue?page_size=5&fields=id')
+        self.assertEqual(response.json()['count'], 1197)
+        self.assertLess(max(param_counts), 50)
+
+    def test_rules_without_occurrences_are_not_overdue(self):
+        self.create_task(due_date=now() - timedelta(days=3), recurrence='daily', recurrence_until=now() - timedelta(days=5))
+        self.assertEqual(self.client.get('/api/tasks/overdue').json()['count'], 0)
+
+
+class TaskOccurrenceTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.create_task(due_date=now() + timedelta(hours=1), recurrence='daily')
+        self.second = self.task.due_date + timedelta(days=1)
+
+    def patch_occurrence(self, data):
+        return self.client.patch(f'/api/tasks/{self.task.id}/occurrences/', data, format='json')
+
+    def test_completing_an_occurrence_shows_in_the_agenda(self):
+        response = self.patch_occurrence({'occurrence_date': self.second.isoformat(), 'completed': True})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TaskOccurrence.objects.filter(task=self.task).count(), 1)
+
+        results = self.client.get('/api/tasks/agenda?fields=id&page_size=3').json()['results']
+        self.assertEqual([item['occurrence_completed'] for item in results], [False, True, False])
+
+    def test_completed_is_required(self):
+        self.patch_occurrence({'occurrence_date': self.second.isoformat(), 'completed': True})
+        response = self.patch_occurrence({'occurrence_date': self.second.isoformat()})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(TaskOccurrence.objects.get(task=self.task).completed)
+
+    def test_date_must_be_an_occurrence(self):
+        response = self.patch_occurrence({'occurrence_date': (self.second + timedelta(hours=1)).isoformat(), 'completed': True})
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_tasks_have_no_occurrences(self):
+        self.task = self.create_task(due_date=now() + timedelta(hours=1))
+        response = self.patch_occurrence({'occurrence_date': self.task.due_date.isoformat(), 'completed': True})
+        self.assertEqual(response.status_code, 400)
+
+    def test_shortening_the_rule_drops_cut_off_occurrences(self):
+        self.patch_occurrence({'occurrence_date': self.task.due_date.isoformat(), 'completed': True})
+        self.patch_occurrence({'occurrence_date': self.second.isoformat(), 'completed': True})
+        response = self.client.patch(f'/api/tasks/{self.task.id}/update/', {'recurrence_count': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(TaskOccurrence.objects.filter(task=self.task).values_list('occurrence_date', flat=True)), [self.task.due_date])
+
+    def test_agenda_orders_simultaneous_occurrences_by_task(self):
+        due_date = now() + timedelta(hours=2)
+        ids = sorted(self.create_task(title=f'Task {i}', due_date=due_date).id for i in range(5))
+        results = self.client.get('/api/tasks/agenda?fields=id&page_size=100').json()['results']
+        self.assertEqual([item['id'] for item in results if item['occurrence_date'] == due_date.isoformat().replace('+00:00', 'Z')], [str(task_id) for task_id in ids])
+
+    def test_changing_the_rule_clears_occurrences(self):
+        self.patch_occurrence({'occurrence_date': self.second.isoformat(), 'completed': True})
+        self.client.patch(f'/api/tasks/{self.task.id}/update/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(TaskOccurrence.objects.filter(task=self.task).count(), 1)
+
+        response = self.client.patch(f'/api/tasks/{self.task.id}/update/', {'recurrence': 'weekly'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(TaskOccurrence.objects.filter(task=self.task).exists())
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_warm_up_steps(self):
+        resolve_routes()
+        build_serializers()
+        load_authentication()
+
+    def test_asgi_app_loads_inside_an_event_loop(self):
+        async def load():
+            import TaskManager.asgi
+            importlib.reload(TaskManager.asgi)
+
+        asyncio.run(load())
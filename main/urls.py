@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import TaskList, TaskCreate, TaskRetrieve, TaskUpdate, TaskDelete, UserLoginView, UserSignupView, TaskOverdue
+from .views import TaskList, TaskCreate, TaskRetrieve, TaskUpdate, TaskDelete, UserLoginView, UserSignupView, TaskOverdue, TaskAgenda, TaskOccurrenceUpdate, BatchView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 urlpatterns = [
@@ -8,10 +8,13 @@ urlpatterns = [
 
     path("api/tasks/list", TaskList.as_view(), name="list_tasks"),
     path("api/tasks/overdue", TaskOverdue.as_view(), name="overdue_tasks"),
+    path("api/tasks/agenda", TaskAgenda.as_view(), name="agenda_tasks"),
     path("api/tasks/create", TaskCreate.as_view(), name="create_tasks"),
     path("api/tasks/<str:pk>/", TaskRetrieve.as_view(), name="retrieve_task"),
     path("api/tasks/<str:pk>/update/", TaskUpdate.as_view(), name="update_task"),
     path("api/tasks/<str:pk>/delete/", TaskDelete.as_view(), name="delete_task"),
+    path("api/tasks/<str:pk>/occurrences/", TaskOccurrenceUpdate.as_view(), name="update_task_occurrence"),
+    path("api/batch", BatchView.as_view(), name="batch"),
 
     # Spectacular Schema & Swagger UI
     path("schema/", SpectacularAPIView.as_view(), name="schema"),